@@ -7,10 +7,11 @@ This application reads the values of BACnet points, packages them up into a
 JSON document and it to https://dweet.io where it is very simple to follow
 the values and create a dashboard.
 
-This application requires the BACpypes and dweepy library, both are available
-in PyPI.
+This application requires the BACpypes and requests libraries, both are
+available in PyPI.  If the orjson library is installed it is used for faster
+JSON encoding and decoding.
 
-    $ pip install bacpypes dweepy
+    $ pip install bacpypes requests orjson
 
 For a description of the contents of the JSON configuration file, see the
 README.
@@ -22,9 +23,13 @@ import signal
 import json
 import logging
 
-from time import time, sleep
-from threading import Thread
-from collections import namedtuple, OrderedDict
+from math import ceil, isfinite
+from time import monotonic, strftime
+from queue import Queue, Empty
+from heapq import heappush, heappop
+from threading import Thread, Event, Lock, Semaphore
+from functools import lru_cache
+from types import SimpleNamespace
 from configparser import ConfigParser as _ConfigParser
 
 from bacpypes.debugging import bacpypes_debugging, ModuleLogger
@@ -36,14 +41,22 @@ from bacpypes.iocb import IOCB
 from bacpypes.pdu import Address
 from bacpypes.object import get_datatype
 
-from bacpypes.apdu import ReadPropertyRequest
+from bacpypes.apdu import ReadPropertyRequest, ReadPropertyMultipleRequest, \
+    ReadPropertyMultipleACK, ReadAccessSpecification, PropertyReference, \
+    RejectPDU, RejectReason, AbortPDU, AbortReason
 from bacpypes.primitivedata import Unsigned
 from bacpypes.constructeddata import Array
 
 from bacpypes.app import BIPSimpleApplication
 from bacpypes.local.device import LocalDeviceObject
 
-import dweepy
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # some debugging
 _debug = 0
@@ -53,104 +66,577 @@ _log = ModuleLogger(globals())
 BACPYPES_INI = os.getenv('BACPYPES_INI', 'BACpypes.ini')
 SETTINGS = os.getenv("SETTINGS", "bacpypes-dweet.json")
 
+# dweet.io service
+DWEET_URL = "https://dweet.io/dweet/for/"
+DWEET_HEADERS = {"Content-Type": "application/json"}
+DWEET_FRAME_INTERVAL = float(os.getenv("DWEET_FRAME_INTERVAL", "1.0"))
+DWEET_TIMEOUT = 10
+
+# most points to ask for in one ReadPropertyMultiple request
+READ_MULTIPLE_LIMIT = 20
+
+# threads that run the polls
+POLL_WORKERS = int(os.getenv("POLL_WORKERS", "4"))
+
 # globals
 this_application = None
+dweet_scheduler = None
+dweet_sender = None
+
+# things built from the current settings
+_active_things = []
+
+#
+#   JSON helpers
+#
+
+def _to_settings(obj):
+    """Recursively turn the decoded JSON objects into namespaces."""
+    if isinstance(obj, dict):
+        return SimpleNamespace(**{k: _to_settings(v) for k, v in obj.items()})
+    elif isinstance(obj, list):
+        return [_to_settings(v) for v in obj]
+    else:
+        return obj
+
+if orjson:
+    _json_dumps = orjson.dumps
+
+    def _json_load_settings(data):
+        # orjson has no object_hook, walk the result
+        return _to_settings(orjson.loads(data))
+else:
+    def _json_dumps(obj):
+        return json.dumps(obj, separators=(',', ':'), allow_nan=False).encode('utf-8')
+
+    def _json_load_settings(data):
+        return json.loads(data, object_hook=lambda d: SimpleNamespace(**d))
 
 #
-#   DweetThread
+#   _get_datatype
+#
+
+@lru_cache(maxsize=None)
+def _get_datatype(object_type, property_identifier):
+    """Return the datatype of an object property, the answer never changes
+    so it is cached."""
+    return get_datatype(object_type, property_identifier)
+
+#
+#   _get_address
+#
+
+@lru_cache(maxsize=None)
+def _get_address(address):
+    """Return the Address for the string, points in the same device share
+    the same object and it is not parsed again when the settings are
+    reloaded."""
+    return Address(address)
+
+#
+#   _value_post
+#
+
+def _value_post(point):
+    """Return a function that applies the value options of the point, so
+    the choice is made once when the settings are loaded."""
+    value_map = {}
+    if hasattr(point, 'active'):
+        value_map['active'] = point.active
+    if hasattr(point, 'inactive'):
+        value_map['inactive'] = point.inactive
+
+    decnum = getattr(point, 'decnum', None)
+
+    if (not value_map) and (decnum is None):
+        return lambda value: value
+
+    def post(value):
+        # only strings can match, other values may not be hashable
+        if value_map and isinstance(value, str):
+            value = value_map.get(value, value)
+
+        # trim the display
+        if (decnum is not None) and isinstance(value, float):
+            value = round(value, decnum)
+
+        return value
+
+    return post
+
+#
+#   _unrecognized_service
+#
+
+# addresses of devices that do not support ReadPropertyMultiple
+_read_multiple_unsupported = set()
+
+def _unrecognized_service(err):
+    """Return true if the error is a reject because the device does not
+    know the service."""
+    return isinstance(err, RejectPDU) and (
+        err.apduAbortRejectReason in (RejectReason.enumerations['unrecognizedService'], 'unrecognizedService')
+        )
+
+def _no_response(err):
+    """Return true if the error is an abort because the device did not
+    answer, reading the points one at a time will not help."""
+    return isinstance(err, AbortPDU) and (
+        err.apduAbortRejectReason in (AbortReason.enumerations.get('noResponse'), 'noResponse')
+        )
+
+#
+#   DweetThing
 #
 
 @bacpypes_debugging
-class DweetThread(Thread):
+class DweetThing:
+
+    """Poll the points of a thing and pass the values along to be sent.
+    It is scheduled by the DweetScheduler and polled by a DweetPoller."""
 
     def __init__(self, dweet):
-        if _debug: DweetThread._debug("__init__ %r", dweet)
-        Thread.__init__(self)
+        if _debug: DweetThing._debug("__init__ %r", dweet)
 
         # save the parameters for reference
         self.thing_name = dweet.thingName
-        self.point_list = dweet.tagList
+        self.point_groups = dweet._point_groups
         self.interval = dweet.interval
 
+        # reused for building the JSON payload
+        self.payload = bytearray(b'{')
+
+        # true while a poller is working on it
+        self.polling = False
+
+        # set when the settings are reloaded
+        self._stop_event = Event()
+
+    def stop(self):
+        if _debug: DweetThing._debug("stop %r", self.thing_name)
+        self._stop_event.set()
+
+    def stopped(self):
+        return self._stop_event.is_set()
+
+    def read_property(self, point, done):
+        """Give a ReadProperty request for the point to the application
+        and return the IOCB, the semaphore is released when it completes."""
+        if _debug: DweetThing._debug("read_property %r", point.tag)
+
+        # build a request
+        request = ReadPropertyRequest(
+            destination=point._address_obj,
+            objectIdentifier=point._obj_id,
+            propertyIdentifier=point._prop_id,
+            )
+        if _debug: DweetThing._debug("    - request: %r", request)
+
+        # make an IOCB, let the poll know when it completes
+        iocb = IOCB(request)
+        iocb.add_callback(lambda _: done.release())
+        if _debug: DweetThing._debug("    - iocb: %r", iocb)
+
+        # give it to the application
+        this_application.request_io(iocb)
+
+        return iocb
+
+    def read_property_multiple(self, points, done):
+        """Give a ReadPropertyMultiple request for the points, which are all
+        in the same device, to the application and return the IOCB, the
+        semaphore is released when it completes."""
+        if _debug: DweetThing._debug("read_property_multiple %r", [point.tag for point in points])
+
+        # build a request
+        request = ReadPropertyMultipleRequest(
+            destination=points[0]._address_obj,
+            listOfReadAccessSpecs=[point._read_access_spec for point in points],
+            )
+        if _debug: DweetThing._debug("    - request: %r", request)
+
+        # make an IOCB, let the poll know when it completes
+        iocb = IOCB(request)
+        iocb.add_callback(lambda _: done.release())
+        if _debug: DweetThing._debug("    - iocb: %r", iocb)
+
+        # give it to the application
+        this_application.request_io(iocb)
+
+        return iocb
+
+    def poll(self):
+        if _debug: DweetThing._debug("poll")
+
+        # the payload is built from the pre-encoded tags and the values
+        payload = self.payload
+        del payload[1:]
+
+        # released as each request of this poll completes
+        done = Semaphore(0)
+
+        # give the requests to the application so they are all in flight
+        # at the same time, one for each group of points in a device
+        # unless it only understands ReadProperty
+        pending = []
+        for points in self.point_groups:
+            if points[0].address in _read_multiple_unsupported:
+                pending.extend(([point], self.read_property(point, done)) for point in points)
+            else:
+                pending.append((points, self.read_property_multiple(points, done)))
+
+        while pending:
+            # wait for all of them to complete
+            for _ in range(len(pending)):
+                done.acquire()
+
+            # collect the responses
+            retry = []
+            for points, iocb in pending:
+                if iocb.ioError:
+                    err = iocb.ioError
+                    if _debug: DweetThing._debug("    - error: %r", err)
+
+                    # when the whole group fails, with an error from the
+                    # device or one raised while encoding the request, read
+                    # the points one at a time so only the bad ones are lost,
+                    # and remember the devices that do not know the service
+                    if isinstance(iocb.args[0], ReadPropertyMultipleRequest) \
+                            and not _no_response(err):
+                        DweetThing._warning("%s: read multiple failed, reading points one at a time: %r", points[0].address, err)
+                        if _unrecognized_service(err):
+                            _read_multiple_unsupported.add(points[0].address)
+                        retry.extend(([point], self.read_property(point, done)) for point in points)
+                    continue
+
+                apdu = iocb.ioResponse
+
+                # line up the points with their values
+                if isinstance(apdu, ReadPropertyMultipleACK):
+                    results = []
+                    for point, access_result in zip(points, apdu.listOfReadAccessResults):
+                        element = access_result.listOfResults[0]
+                        read_result = element.readResult
+                        if read_result.propertyAccessError is not None:
+                            if _debug: DweetThing._debug("    - %s error: %r", point.tag, read_result.propertyAccessError)
+                            continue
+                        results.append((point, element.propertyArrayIndex, read_result.propertyValue))
+                else:
+                    results = [(points[0], apdu.propertyArrayIndex, apdu.propertyValue)]
+
+                for point, array_index, property_value in results:
+                    # datatype was found when the settings were loaded
+                    datatype = point._datatype
+                    if _debug: DweetThing._debug("    - datatype: %r", datatype)
+                    if not datatype:
+                        DweetThing._warning("%s: unknown datatype", point.tag)
+                        continue
+
+                    # a bad value only loses this point
+                    try:
+                        # special case for array parts, others are managed by cast_out
+                        if issubclass(datatype, Array) and (array_index is not None):
+                            if array_index == 0:
+                                value = property_value.cast_out(Unsigned)
+                            else:
+                                value = property_value.cast_out(datatype.subtype)
+                        else:
+                            value = property_value.cast_out(datatype)
+                        if _debug: DweetThing._debug("    - value: %r", value)
+
+                        # translate or trim the display
+                        value = point._post(value)
+                        if _debug: DweetThing._debug("    - post: %r", value)
+
+                        encoded_value = _json_dumps(value)
+                    except Exception as err:
+                        DweetThing._warning("%s: %r", point.tag, err)
+                        continue
+
+                    # save the value
+                    payload += point._json_key
+                    payload += encoded_value
+                    payload += b','
+
+            # points to read again one at a time
+            pending = retry
+
+        # pass the data along to be sent
+        if len(payload) > 1:
+            payload[-1:] = b'}'
+            if _debug: DweetThing._debug("    - %s: %s", self.thing_name, payload.decode("utf-8"))
+            dweet_sender.send(self.thing_name, bytes(payload))
+
+#
+#   DweetScheduler
+#
+
+@bacpypes_debugging
+class DweetScheduler(Thread):
+
+    """Schedule the polls of all of the things from one thread, the next
+    one to run is at the top of a heap ordered by deadline.  The polls
+    themselves are run by a small pool of pollers, so a device that is
+    not answering holds up one poller for the BACnet timeout and retries
+    rather than every thing.  A thing whose last poll has not finished
+    skips its deadline."""
+
+    def __init__(self):
+        if _debug: DweetScheduler._debug("__init__")
+        Thread.__init__(self)
+
+        # (deadline, sequence, dweet_thing) entries
+        self.heap = []
+        self.sequence = 0
+        self.lock = Lock()
+
+        # set when the heap changes
+        self.wakeup = Event()
+
+        # things waiting to be polled and the pollers that poll them
+        self.poll_queue = Queue()
+        self.pollers = [DweetPoller(self.poll_queue) for _ in range(POLL_WORKERS)]
+
         # this is a daemon
         self.daemon = True
 
         # run after the core is ready
         deferred(self.start)
 
+    def replace(self, dweet_things):
+        """Forget the old things and schedule the new ones, the first poll
+        of each is at its next interval boundary."""
+        if _debug: DweetScheduler._debug("replace %r", [dweet_thing.thing_name for dweet_thing in dweet_things])
+
+        now = monotonic()
+        with self.lock:
+            del self.heap[:]
+            for dweet_thing in dweet_things:
+                deadline = ceil(now / dweet_thing.interval) * dweet_thing.interval
+                self._push(deadline, dweet_thing)
+        self.wakeup.set()
+
+    def push(self, deadline, dweet_thing):
+        with self.lock:
+            self._push(deadline, dweet_thing)
+        self.wakeup.set()
+
+    def _push(self, deadline, dweet_thing):
+        # the sequence number keeps things from being compared
+        heappush(self.heap, (deadline, self.sequence, dweet_thing))
+        self.sequence += 1
+
     def run(self):
-        if _debug: DweetThread._debug("run")
+        if _debug: DweetScheduler._debug("run")
 
         while True:
-            # sleep until the next interval
-            now = time()
-            sleep(self.interval - (now % self.interval))
-            if _debug: DweetThread._debug("    - awake")
-
-            # gathering spot for the data
-            dweet_data = OrderedDict()
-
-            # loop through the points
-            for point in self.point_list:
-                # build a request
-                request = ReadPropertyRequest(
-                    destination=Address(point.address),
-                    objectIdentifier=(point.objectType, point.objectInstance),
-                    propertyIdentifier=getattr(point, 'property', 'presentValue'),
-                    )
-                if _debug: DweetThread._debug("    - request: %r", request)
-
-                # make an IOCB
-                iocb = IOCB(request)
-                if _debug: DweetThread._debug("    - iocb: %r", iocb)
-
-                # give it to the application
-                this_application.request_io(iocb)
-
-                # wait for the response
-                iocb.wait()
-
-                if iocb.ioResponse:
-                    apdu = iocb.ioResponse
-
-                    # find the datatype
-                    datatype = get_datatype(apdu.objectIdentifier[0], apdu.propertyIdentifier)
-                    if _debug: DweetThread._debug("    - datatype: %r", datatype)
-                    if not datatype:
-                        raise TypeError("unknown datatype")
+            self.wakeup.clear()
 
-                    # special case for array parts, others are managed by cast_out
-                    if issubclass(datatype, Array) and (apdu.propertyArrayIndex is not None):
-                        if apdu.propertyArrayIndex == 0:
-                            value = apdu.propertyValue.cast_out(Unsigned)
-                        else:
-                            value = apdu.propertyValue.cast_out(datatype.subtype)
-                    else:
-                        value = apdu.propertyValue.cast_out(datatype)
-                    if _debug: DweetThread._debug("    - value: %r", value)
+            # find the time until the next deadline
+            with self.lock:
+                timeout = (self.heap[0][0] - monotonic()) if self.heap else None
 
-                    if value == 'active' and hasattr(point, 'active'):
-                        value = getattr(point, 'acitve', value)
-                    elif value == 'inactive':
-                        value = getattr(point, 'inactive', value)
+            # wait for it, or for the heap to change
+            if (timeout is None) or (timeout > 0):
+                self.wakeup.wait(timeout)
+                continue
 
-                    # trim the display
-                    if isinstance(value, float) and hasattr(point, 'decnum'):
-                        value = round(value, point.decnum)
-                        if _debug: DweetThread._debug("    - rounded: %r", value)
+            with self.lock:
+                deadline, _, dweet_thing = heappop(self.heap)
+            if _debug: DweetScheduler._debug("    - awake: %r", dweet_thing.thing_name)
 
-                    # save the value
-                    dweet_data[point.tag] = value
+            # dropped by a reload
+            if dweet_thing.stopped():
+                continue
 
-                if iocb.ioError:
-                    if _debug: DweetThread._debug("    - error: %r", iocb.ioError)
+            # hand it to a poller unless the last poll is still going
+            if dweet_thing.polling:
+                DweetScheduler._warning("%s: last poll still running, skipped", dweet_thing.thing_name)
+            else:
+                dweet_thing.polling = True
+                self.poll_queue.put(dweet_thing)
+
+            # next deadline, skipping any that have already been missed
+            interval = dweet_thing.interval
+            deadline += interval * max(1, ceil((monotonic() - deadline) / interval))
+            self.push(deadline, dweet_thing)
+
+#
+#   DweetPoller
+#
+
+@bacpypes_debugging
+class DweetPoller(Thread):
+
+    """Poll the things given to it by the scheduler."""
+
+    def __init__(self, poll_queue):
+        if _debug: DweetPoller._debug("__init__")
+        Thread.__init__(self)
+
+        # things waiting to be polled
+        self.poll_queue = poll_queue
+
+        # this is a daemon
+        self.daemon = True
+
+        # run after the core is ready
+        deferred(self.start)
+
+    def run(self):
+        if _debug: DweetPoller._debug("run")
+
+        while True:
+            dweet_thing = self.poll_queue.get()
+            if _debug: DweetPoller._debug("    - dweet_thing: %r", dweet_thing.thing_name)
+
+            # stopped by a reload while it was waiting
+            if dweet_thing.stopped():
+                dweet_thing.polling = False
+                continue
+
+            try:
+                dweet_thing.poll()
+            except Exception as err:
+                DweetPoller._exception("poll failed: %r", err)
+            finally:
+                dweet_thing.polling = False
+
+#
+#   DweetSender
+#
+
+@bacpypes_debugging
+class DweetSender(Thread):
+
+    """Send dweets from a thread of their own so the polling threads are
+    not held up by the HTTPS traffic.  Dweets that arrive within a frame
+    are sent together over the same connection, and when there is more
+    than one for the same thing only the most recent is sent."""
+
+    def __init__(self):
+        if _debug: DweetSender._debug("__init__")
+        Thread.__init__(self)
+
+        # dweets waiting to be sent
+        self.queue = Queue()
+
+        # keep the connection alive between frames
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(pool_connections=16, pool_maxsize=32))
+        self.session.headers.update(DWEET_HEADERS)
+
+        # this is a daemon
+        self.daemon = True
+
+        # run after the core is ready
+        deferred(self.start)
+
+    def send(self, thing_name, payload):
+        if _debug: DweetSender._debug("send %r %r", thing_name, payload)
+        self.queue.put((thing_name, payload))
+
+    def run(self):
+        if _debug: DweetSender._debug("run")
 
-            # send the data
-            if dweet_data:
-                if _debug: DweetThread._debug(self.thing_name + ' ' + ', '.join("{}: {}".format(k,v) for k, v in dweet_data.items()) + '\n')
-                dweepy.dweet_for(self.thing_name, dweet_data)
+        while True:
+            # wait for something to send
+            thing_name, payload = self.queue.get()
+            frame = {thing_name: payload}
+
+            # gather up the rest of the frame
+            frame_end = monotonic() + DWEET_FRAME_INTERVAL
+            while True:
+                timeout = frame_end - monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    thing_name, payload = self.queue.get(timeout=timeout)
+                except Empty:
+                    break
+                frame[thing_name] = payload
+            if _debug: DweetSender._debug("    - frame: %r", list(frame))
+
+            for thing_name, payload in frame.items():
+                self.post(thing_name, payload)
+
+    def post(self, thing_name, payload):
+        if _debug: DweetSender._debug("post %r", thing_name)
+
+        try:
+            response = self.session.post(
+                DWEET_URL + thing_name,
+                data=payload,
+                timeout=DWEET_TIMEOUT,
+                )
+            if not response.ok:
+                DweetSender._warning("dweet failed: %s %s", response.status_code, response.text)
+        except requests.RequestException as err:
+            DweetSender._warning("dweet failed: %r", err)
 
 
+#
+#   _build_things
+#
+
+@bacpypes_debugging
+def _build_things():
+    """Read the settings and build a thing for each dweet, every point is
+    checked before anything is scheduled."""
+    if _debug: _build_things._debug("_build_things")
+
+    with open(args.settings, 'rb') as settings_file:
+        new_settings = _json_load_settings(settings_file.read())
+        if _debug: _build_things._debug("    - settings: %r", new_settings)
+
+    # add the points
+    dweet_things = []
+    for dweet in new_settings.dweets:
+        if _debug: _build_things._debug("    - dweet: %r", dweet)
+
+        # the thing name is part of the URL
+        if not isinstance(dweet.thingName, str):
+            raise ValueError("%r: thingName must be a string" % (dweet.thingName,))
+
+        # the scheduler divides by the interval
+        interval = dweet.interval
+        if isinstance(interval, bool) or not isinstance(interval, (int, float)) \
+                or not isfinite(interval) or (interval <= 0):
+            raise ValueError("%s: interval must be a positive number" % (dweet.thingName,))
+
+        # the request parameters do not change, build them once
+        devices = {}
+        for point in dweet.tagList:
+            point._address_obj = _get_address(point.address)
+            point._obj_id = (point.objectType, point.objectInstance)
+            point._prop_id = getattr(point, 'property', 'presentValue')
+            point._datatype = _get_datatype(point.objectType, point._prop_id)
+            if not point._datatype:
+                raise ValueError("%s: unknown object type or property" % (point.tag,))
+            point._post = _value_post(point)
+            point._json_key = _json_dumps(str(point.tag)) + b':'
+            point._read_access_spec = ReadAccessSpecification(
+                objectIdentifier=point._obj_id,
+                listOfPropertyReferences=[PropertyReference(propertyIdentifier=point._prop_id)],
+                )
+
+            # group the points by device
+            devices.setdefault(point.address, []).append(point)
+
+        # split the groups into requests that are not too large
+        dweet._point_groups = [
+            points[i:i + READ_MULTIPLE_LIMIT]
+            for points in devices.values()
+            for i in range(0, len(points), READ_MULTIPLE_LIMIT)
+            ]
+
+        # make a thing
+        dweet_thing = DweetThing(dweet)
+        if _debug: _build_things._debug("    - dweet_thing: %r", dweet_thing)
+        dweet_things.append(dweet_thing)
+
+    return new_settings, dweet_things
+
 #
 #   load_settings
 #
@@ -160,26 +646,28 @@ def load_settings(*signal_args):
     """Call to stop running, may be called with a signum and frame
     parameter if called as a signal handler."""
     if _debug: load_settings._debug("load_settings %r", signal_args)
-    global args, settings
+    global args, settings, _active_things
 
     if signal_args:
-        sys.stderr.write("===== HUP Signal, %s\n" % time.strftime("%d-%b-%Y %H:%M:%S"))
+        sys.stderr.write("===== HUP Signal, %s\n" % strftime("%d-%b-%Y %H:%M:%S"))
         sys.stderr.flush()
 
-    with open(args.settings) as settings_file:
-        settings = json.load(
-            settings_file,
-            object_hook=lambda d: namedtuple('Settings', d.keys())(*d.values())
-            )
-        if _debug: load_settings._debug("    - settings: %r", settings)
+    # a bad reload keeps the things that are running
+    try:
+        new_settings, dweet_things = _build_things()
+    except Exception as err:
+        if not signal_args:
+            raise
+        load_settings._exception("reload failed, settings unchanged: %r", err)
+        return
 
-    # add the points
-    for dweet in settings.dweets:
-        if _debug: load_settings._debug("    - dweet: %r", dweet)
+    # stop the old things and schedule the new ones in their place
+    for dweet_thing in _active_things:
+        dweet_thing.stop()
+    dweet_scheduler.replace(dweet_things)
 
-        # make a thing
-        dweet_thing = DweetThread(dweet)
-        if _debug: load_settings._debug("    - dweet_thing: %r", dweet_thing)
+    settings = new_settings
+    _active_things = dweet_things
 
 # set a TERM signal handler
 if hasattr(signal, 'SIGHUP'):
@@ -191,7 +679,7 @@ if hasattr(signal, 'SIGHUP'):
 #
 
 def main():
-    global args, settings, this_application
+    global args, settings, this_application, dweet_scheduler, dweet_sender
 
     # build a parser for the command line arguments
     parser = ArgumentParser(description=__doc__)
@@ -214,6 +702,10 @@ def main():
     if _debug: _log.debug("initialization")
     if _debug: _log.debug("    - args: %r", args)
 
+    # make a scheduler for the polls and a sender for the dweets
+    dweet_scheduler = DweetScheduler()
+    dweet_sender = DweetSender()
+
     # load the settings
     load_settings()
 